@@ -3,31 +3,65 @@
 Main application module.
 Handles HTTP routes and request processing.
 """
-from quart import Quart, request, send_file, render_template
+from quart import Quart, Response, request, send_file, render_template
 from quart_cors import cors
+from werkzeug.exceptions import RequestEntityTooLarge
 import asyncio
+import atexit
 import logging
-import uuid
-import io
+import logging.handlers
+import queue
+from concurrent.futures import ProcessPoolExecutor
 from hypercorn.config import Config
 from hypercorn.asyncio import serve
 from config import (
-    MAX_CONCURRENT_TASKS, 
     VOICES,
-    BASE_TEMP_DIR  # Added this import
+    BASE_TEMP_DIR,  # Added this import
+    CACHE_DIR,
+    CACHE_PRUNE_INTERVAL,
+    HOT_PHRASES_FILE,
+    MAX_PENDING_REQUESTS,
+    MAX_REQUEST_BYTES,
+    MAX_TEXT_CHARS,
+    SERVER_BACKLOG,
+    SPLIT_IN_PROCESS_THRESHOLD,
+    SPLIT_PROCESS_WORKERS,
+    WARM_LOCK_FILE
 )
-from speech_generator import SpeechGenerator
-from utils import FileManager
-
-# Configure logging
+from speech_generator import SpeechGenerator, SynthesisCache, SharedSession
+from utils import FileManager, CacheManager
+
+# fcntl is unavailable on Windows, where every worker warms the cache
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Configure logging; records are queued and written by a listener thread,
+# so the event loop never blocks on the stream
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[logging.handlers.QueueHandler(log_queue)]
 )
+log_listener.start()
+atexit.register(log_listener.stop)
 logger = logging.getLogger(__name__)
 
 app = Quart(__name__)
 app = cors(app, allow_origin="*")
+# Oversized bodies are refused up front, or cut off while being read if unannounced
+app.config['MAX_CONTENT_LENGTH'] = MAX_REQUEST_BYTES
+
+synthesis_cache = SynthesisCache(CACHE_DIR, memory=CacheManager())
+# One generator serves every request so its state outlives a single call
+speech_generator = SpeechGenerator(cache=synthesis_cache)
+cache_pruner = None
+split_pool = None
+# Requests admitted but still waiting for their first audio chunk
+pending_requests = 0
 
 @app.route('/')
 async def home():
@@ -39,21 +73,23 @@ async def text_to_speech():
     """
     Convert text to speech.
     Expects JSON with 'text' and optional 'voice' fields.
+    The MP3 response is streamed as segments are synthesized.
     """
-    work_dir = None
-    output_file = None
-    all_temp_files = []
-
+    global pending_requests
     try:
-        work_dir = FileManager.get_temp_dir()
+        try:
+            data = await request.get_json()
+        except RequestEntityTooLarge:
+            return {'error': 'Request too large'}, 413
 
-        data = await request.get_json()
         if not data or 'text' not in data:
             return {'error': 'No text provided'}, 400
 
         text = data.get('text', '').strip()
         if not text:
             return {'error': 'Empty text provided'}, 400
+        if len(text) > MAX_TEXT_CHARS:
+            return {'error': f'Text exceeds {MAX_TEXT_CHARS} characters'}, 413
 
         voice_gender = data.get('voice', 'male')
         if voice_gender not in VOICES:
@@ -61,62 +97,126 @@ async def text_to_speech():
 
         logger.info(f'Processing text with {voice_gender} voice')
 
-        session_id = str(uuid.uuid4())
-        output_file = work_dir / f'speech_{session_id}.mp3'
-
-        speech_generator = SpeechGenerator(work_dir)
-        sem = asyncio.Semaphore(MAX_CONCURRENT_TASKS)
-
-        async def process_with_semaphore(text_chunk, index):
-            async with sem:
-                return await speech_generator.process_text_chunk(text_chunk, voice_gender, session_id, index)
-
-        tasks = [process_with_semaphore(text, 0)]
-        chunk_results = await asyncio.gather(*tasks)
-
-        for chunk_files in chunk_results:
-            all_temp_files.extend(chunk_files)
-
-        if not all_temp_files:
+        if len(text) > SPLIT_IN_PROCESS_THRESHOLD:
+            # Keep long CPU-bound splits off the event loop
+            loop = asyncio.get_running_loop()
+            segments = await loop.run_in_executor(
+                split_pool, SpeechGenerator.plan_segments, text, voice_gender
+            )
+        else:
+            segments = speech_generator.plan_segments(text, voice_gender)
+
+        # A single cached segment is served straight from its cache file
+        if len(segments) == 1:
+            cache_file = synthesis_cache.get_file(*segments[0])
+            if cache_file:
+                return await send_file(cache_file, mimetype='audio/mpeg', conditional=True)
+
+        # Shed load once too many requests are queued behind the synthesis limit
+        if pending_requests >= MAX_PENDING_REQUESTS:
+            logger.warning('Too many pending requests, rejecting')
+            return {'error': 'Server busy, try again later'}, 503, {'Retry-After': '1'}
+
+        audio_stream = speech_generator.stream_speech(segments)
+
+        # Wait for the first audio so early failures still get an error status
+        pending_requests += 1
+        try:
+            first_chunk = await audio_stream.__anext__()
+        except StopAsyncIteration:
             return {'error': 'No audio generated'}, 500
-
-        FileManager.merge_audio_files(all_temp_files, str(output_file))
-
-        # Read the final file
-        with open(output_file, 'rb') as f:
-            data = f.read()
-
-        return await send_file(
-            io.BytesIO(data),
-            mimetype='audio/mpeg'
-        )
+        finally:
+            pending_requests -= 1
+
+        async def generate():
+            try:
+                yield first_chunk
+                async for chunk in audio_stream:
+                    yield chunk
+            except Exception as e:
+                logger.error(f"Error while streaming speech: {str(e)}", exc_info=True)
+            finally:
+                await audio_stream.aclose()
+
+        response = Response(generate(), mimetype='audio/mpeg')
+        # Long texts may stream for longer than Quart's default response timeout
+        response.timeout = None
+        # Stop a fronting nginx from buffering the stream until it completes
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
 
     except Exception as e:
         logger.error(f"Error in text_to_speech: {str(e)}", exc_info=True)
         return {'error': str(e)}, 500
 
-    finally:
-        # Clean up
-        try:
-            if all_temp_files:
-                FileManager.cleanup_files(all_temp_files)
-            if output_file and output_file.exists():
-                output_file.unlink()
-            if work_dir and work_dir.exists():
-                work_dir.rmdir()
-        except Exception as e:
-            logger.error(f"Error in cleanup: {str(e)}")
-
 async def run_app():
     """Run the application with Hypercorn server."""
     config = Config()
     config.bind = ["0.0.0.0:5001"]
+    config.backlog = SERVER_BACKLOG
     await serve(app, config)
 
 def initialize_app():
     """Initialize application directories and settings."""
     FileManager.ensure_directory_exists(BASE_TEMP_DIR)
+    FileManager.ensure_directory_exists(CACHE_DIR)
 
-if __name__ == '__main__':
+@app.before_serving
+async def startup():
+    """Run one-time initialization inside the server's event loop."""
+    global cache_pruner, split_pool
     initialize_app()
-    asyncio.run(run_app())
+    SharedSession.prewarm()
+    split_pool = ProcessPoolExecutor(max_workers=SPLIT_PROCESS_WORKERS)
+    cache_pruner = asyncio.create_task(prune_cache_periodically())
+
+    if HOT_PHRASES_FILE.exists():
+        with open(HOT_PHRASES_FILE, encoding='utf-8') as f:
+            phrases = [line.strip() for line in f if line.strip()]
+        app.add_background_task(warm_cache, phrases)
+
+async def prune_cache_periodically():
+    """Prune expired cache entries off the request path."""
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            removed = await loop.run_in_executor(None, synthesis_cache.prune)
+            if removed:
+                logger.info(f'Pruned {removed} expired cache entries')
+        except Exception as e:
+            logger.error(f"Error pruning cache: {str(e)}")
+        await asyncio.sleep(CACHE_PRUNE_INTERVAL)
+
+async def warm_cache(phrases):
+    """
+    Pre-synthesize hot phrases into the synthesis cache.
+    Every worker starts at once and shares the disk cache, so only the one
+    holding the warm-up lock synthesizes; the others skip the warm-up.
+    """
+    with open(WARM_LOCK_FILE, 'w') as lock:
+        if fcntl:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                logger.info('Cache warm-up running in another worker, skipping')
+                return
+        warmed = await speech_generator.warm_cache(phrases)
+    logger.info(f'Warmed synthesis cache with {warmed} segments')
+
+@app.after_serving
+async def shutdown():
+    """Release resources held across requests."""
+    if cache_pruner:
+        cache_pruner.cancel()
+    if split_pool:
+        split_pool.shutdown(cancel_futures=True)
+    await speech_generator.close()
+
+if __name__ == '__main__':
+    # uvloop is optional and unavailable on Windows
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(run_app())
+    else:
+        uvloop.run(run_app())
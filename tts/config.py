@@ -9,13 +9,36 @@ from pathlib import Path
 # Application root and temporary directories
 APP_ROOT = Path(os.path.dirname(os.path.abspath(__file__)))
 BASE_TEMP_DIR = APP_ROOT / 'temp'
+CACHE_DIR = BASE_TEMP_DIR / 'cache'
+HOT_PHRASES_FILE = BASE_TEMP_DIR / 'hot_phrases.txt'
+WARM_LOCK_FILE = CACHE_DIR / '.warm.lock'  # Held by the one worker warming the cache
+
+# Server configurations
+SERVER_BACKLOG = 2048
+MAX_REQUEST_BYTES = 1000000  # Larger /tts bodies are rejected with 413
+MAX_TEXT_CHARS = 200000
 
 # Text processing configurations
 MAX_SEGMENT_LENGTH = 1000
 MIN_SEGMENT_LENGTH = 2
-MAX_CONCURRENT_TASKS = 4
+SEGMENT_BATCH_LENGTH = 200  # Consecutive same-language segments of a line are merged into one request up to this length
+MAX_CONCURRENT_TASKS = int(os.environ.get('TTS_MAX_CONCURRENT_TASKS', 4))
+MIN_CONCURRENT_TASKS = 1  # Floor the limit backs off to while the service throttles
+CONCURRENCY_RECOVERY_SUCCESSES = 8  # Successful requests before the limit is raised by one
+STREAM_PREFETCH = 4  # Segments synthesized ahead of the one being streamed
+MAX_PENDING_REQUESTS = int(os.environ.get('TTS_MAX_PENDING_REQUESTS', 64))  # Requests awaiting first audio before new ones get 503
+SPLIT_IN_PROCESS_THRESHOLD = 10000  # Characters above which text is split in a worker process
+SPLIT_PROCESS_WORKERS = 2
 DEFAULT_TIMEOUT = 30
-BUFFER_SIZE = 10485760
+MAX_RETRIES = 3
+RETRY_BASE_DELAY = 0.5  # Seconds, doubled after each failed attempt
+
+# Synthesis cache configurations
+CACHE_TTL = 7 * 24 * 3600  # Seconds before a cached segment may be pruned
+CACHE_PRUNE_INTERVAL = 3600  # Seconds between background cache prunes
+MEMORY_CACHE_SIZE = 128 * 1024 * 1024  # Bytes of audio kept in the in-memory cache
+KEY_CACHE_SIZE = 2048  # Recent (text, voice) cache keys kept without rehashing
+LINE_CACHE_SIZE = 4096  # Recent short lines whose segment splits are kept
 
 # Voice configurations
 VOICES = {
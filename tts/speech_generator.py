@@ -2,40 +2,521 @@
 """
 Speech generation module with improved handling of mixed language and numbers.
 """
+import aiohttp
 import asyncio
+import certifi
 import edge_tts
+import edge_tts.communicate
+from edge_tts.exceptions import NoAudioReceived
+import functools
+import hashlib
+import itertools
+import json
 import logging
-from typing import List
+import os
+import shutil
+import ssl
+import time
+import weakref
+from typing import AsyncIterator, List, Optional, Tuple, Union
 from pathlib import Path
-from config import DEFAULT_TIMEOUT, VOICES, MIN_SEGMENT_LENGTH
+from config import (
+    DEFAULT_TIMEOUT,
+    VOICES,
+    MAX_CONCURRENT_TASKS,
+    MIN_CONCURRENT_TASKS,
+    CONCURRENCY_RECOVERY_SUCCESSES,
+    STREAM_PREFETCH,
+    MAX_RETRIES,
+    RETRY_BASE_DELAY,
+    CACHE_DIR,
+    CACHE_TTL,
+    KEY_CACHE_SIZE,
+    LINE_CACHE_SIZE,
+    MAX_SEGMENT_LENGTH
+)
 from text_processor import TextProcessor
+from utils import CacheManager, FileManager
 
 logger = logging.getLogger(__name__)
 
+_tmp_counter = itertools.count()
+
+def _temp_path(path: str) -> str:
+    """Return a unique temp name beside path; pid plus a process-wide counter keeps writers apart."""
+    return f'{path}.{os.getpid()}.{next(_tmp_counter)}.tmp'
+
+def _replace_file(path: str, data: bytes) -> None:
+    """
+    Write data to a temp name and rename it over path.
+    An existing path may be a hard link to a cache entry, so it is
+    replaced rather than truncated and written through.
+    """
+    tmp_path = _temp_path(path)
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+class SharedSession:
+    """
+    Process-wide aiohttp session reused by every edge-tts request.
+    
+    edge-tts opens a new ClientSession for each segment. install() swaps
+    the aiohttp module seen by edge_tts.communicate for a proxy whose
+    ClientSession hands out this shared session instead, keeping its
+    connector and DNS cache warm across segments and requests.
+    
+    It also builds a new SSL context, reloading the CA bundle, for each
+    segment; the ssl module is proxied the same way so the context is
+    built once and reused.
+    """
+    _session: Optional[aiohttp.ClientSession] = None
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+
+    class _Borrowed:
+        """Async context manager that lends the shared session without closing it."""
+        def __init__(self, session: aiohttp.ClientSession):
+            self.session = session
+
+        async def __aenter__(self) -> aiohttp.ClientSession:
+            return self.session
+
+        async def __aexit__(self, *exc_info) -> None:
+            pass
+
+    class _AiohttpProxy:
+        """Stand-in for the aiohttp module inside edge_tts.communicate."""
+        def __getattr__(self, name: str):
+            return getattr(aiohttp, name)
+
+        def ClientSession(self, *args, **kwargs) -> "SharedSession._Borrowed":
+            return SharedSession._Borrowed(SharedSession.get())
+
+    class _SslProxy:
+        """Stand-in for the ssl module inside edge_tts.communicate."""
+        def __init__(self):
+            self._contexts = {}
+
+        def __getattr__(self, name: str):
+            return getattr(ssl, name)
+
+        def create_default_context(self, *args, **kwargs) -> ssl.SSLContext:
+            key = (args, tuple(sorted(kwargs.items())))
+            context = self._contexts.get(key)
+            if context is None:
+                context = self._contexts[key] = ssl.create_default_context(*args, **kwargs)
+            return context
+
+    @classmethod
+    def get(cls) -> aiohttp.ClientSession:
+        """Return the shared session for the running event loop, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        if cls._session is None or cls._session.closed or cls._loop is not loop:
+            cls._session = aiohttp.ClientSession(
+                trust_env=True,
+                connector=aiohttp.TCPConnector(limit=0, ttl_dns_cache=300)
+            )
+            cls._loop = loop
+        return cls._session
+
+    @classmethod
+    def install(cls) -> None:
+        """
+        Route edge-tts session and SSL context creation through shared instances.
+        Safe to call more than once; later calls leave the proxies in place.
+        """
+        current = getattr(edge_tts.communicate, 'aiohttp', None)
+        if current is aiohttp:
+            edge_tts.communicate.aiohttp = cls._AiohttpProxy()
+        elif not isinstance(current, cls._AiohttpProxy):
+            logger.warning("edge_tts.communicate layout not recognized, shared session not installed")
+
+        current = getattr(edge_tts.communicate, 'ssl', None)
+        if current is ssl:
+            edge_tts.communicate.ssl = cls._SslProxy()
+        elif not isinstance(current, cls._SslProxy):
+            logger.warning("edge_tts.communicate layout not recognized, SSL context not shared")
+
+    @classmethod
+    def prewarm(cls) -> None:
+        """
+        Build the shared session and SSL context before the first request.
+        Without this the first segment synthesized pays for both.
+        """
+        cls.get()
+        if isinstance(edge_tts.communicate.ssl, cls._SslProxy):
+            edge_tts.communicate.ssl.create_default_context(cafile=certifi.where())
+
+    @classmethod
+    async def close(cls) -> None:
+        """Close the shared session."""
+        if cls._session is not None and not cls._session.closed:
+            await cls._session.close()
+        cls._session = None
+        cls._loop = None
+
+class SynthesisCache:
+    """
+    Persistent on-disk cache of synthesized segments keyed by (text, voice).
+    Each entry is stored as <key>.mp3 with a <key>.json sidecar holding
+    its creation time and ttl, so expired entries can be pruned.
+    An optional in-memory LRU layer is consulted before the disk.
+    """
+    def __init__(self,
+                 cache_dir: Path = CACHE_DIR,
+                 ttl: int = CACHE_TTL,
+                 memory: Optional[CacheManager] = None):
+        """
+        Initialize SynthesisCache.
+        
+        Args:
+            cache_dir: Directory holding cached audio files
+            ttl: Seconds before a cached entry is considered expired
+            memory: Optional in-memory cache checked before the disk
+        """
+        self.cache_dir = cache_dir
+        # Entry paths are built by concatenation instead of a Path join per lookup
+        self._prefix = os.path.join(cache_dir, '')
+        self.ttl = ttl
+        self.memory = memory
+
+    @staticmethod
+    @functools.lru_cache(maxsize=KEY_CACHE_SIZE)
+    def make_key(text: str, voice: str) -> str:
+        """Build the cache key for a text segment and voice, memoized for repeated segments."""
+        return hashlib.blake2b(f"{voice}\0{text}".encode('utf-8'), digest_size=16).hexdigest()
+
+    def fetch(self, text: str, voice: str, output_file: str) -> bool:
+        """
+        Place cached audio for (text, voice) at output_file.
+        The on-disk entry is hard-linked when present; the in-memory
+        layer is only written out when the disk entry is missing.
+        
+        Args:
+            text: Text segment
+            voice: Voice ID
+            output_file: Destination file path
+            
+        Returns:
+            bool: True on cache hit, False on miss
+        """
+        if self.link(text, voice, output_file):
+            return True
+
+        if self.memory:
+            data = self.memory.get(self.make_key(text, voice))
+            if data is not None:
+                _replace_file(output_file, data)
+                return True
+
+        return False
+
+    def link(self, text: str, voice: str, output_file: str) -> bool:
+        """
+        Hard-link the on-disk cache entry for (text, voice) to output_file.
+        A destination already linked to the entry counts as placed; any
+        other existing file is replaced. Falls back to a copy when a hard
+        link is not possible.
+        
+        Args:
+            text: Text segment
+            voice: Voice ID
+            output_file: Destination file path
+            
+        Returns:
+            bool: True if the entry was placed, False otherwise
+        """
+        cache_path = self._prefix + self.make_key(text, voice) + '.mp3'
+        try:
+            try:
+                os.link(cache_path, output_file)
+            except FileExistsError:
+                if os.path.samefile(cache_path, output_file):
+                    return True
+                os.unlink(output_file)
+                os.link(cache_path, output_file)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError:
+            # Cross-device or unsupported hard link, fall back to a copy
+            pass
+
+        tmp_path = _temp_path(output_file)
+        try:
+            shutil.copyfile(cache_path, tmp_path)
+            os.replace(tmp_path, output_file)
+            return True
+        except Exception as e:
+            logger.warning(f"Could not copy cache entry {cache_path}: {e}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return False
+
+    def get_file(self, text: str, voice: str) -> Optional[Path]:
+        """
+        Return the on-disk cache file for (text, voice), if present.
+        
+        Args:
+            text: Text segment
+            voice: Voice ID
+            
+        Returns:
+            Path of the cached MP3 file, or None on miss
+        """
+        cache_path = self.cache_dir / f'{self.make_key(text, voice)}.mp3'
+        return cache_path if cache_path.exists() else None
+
+    def get(self, text: str, voice: str) -> Optional[bytes]:
+        """
+        Return cached audio bytes for (text, voice).
+        
+        Args:
+            text: Text segment
+            voice: Voice ID
+            
+        Returns:
+            Cached MP3 bytes, or None on miss
+        """
+        key = self.make_key(text, voice)
+
+        if self.memory:
+            data = self.memory.get(key)
+            if data is not None:
+                return data
+
+        data = self._read_entry(key)
+        if data is not None and self.memory:
+            self.memory.put(key, data)
+        return data
+
+    async def get_async(self, text: str, voice: str) -> Optional[bytes]:
+        """
+        Return cached audio bytes for (text, voice).
+        The in-memory layer is checked inline; a disk read runs in the
+        default executor so it stays off the event loop.
+        
+        Args:
+            text: Text segment
+            voice: Voice ID
+            
+        Returns:
+            Cached MP3 bytes, or None on miss
+        """
+        key = self.make_key(text, voice)
+
+        if self.memory:
+            data = self.memory.get(key)
+            if data is not None:
+                return data
+
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(None, self._read_entry, key)
+        if data is not None and self.memory:
+            self.memory.put(key, data)
+        return data
+
+    def _read_entry(self, key: str) -> Optional[bytes]:
+        """Read an audio file from disk, returning None if it is missing or unreadable."""
+        cache_path = self._prefix + key + '.mp3'
+        try:
+            with open(cache_path, 'rb') as f:
+                # An empty file is never a valid entry, so it is a miss too
+                return f.read() or None
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read cache entry {cache_path}: {e}")
+            return None
+
+    def put(self, text: str, voice: str, data: bytes) -> None:
+        """
+        Store audio bytes for (text, voice) in the cache.
+        Failures are logged and never propagate to the caller.
+        
+        Args:
+            text: Text segment
+            voice: Voice ID
+            data: MP3 bytes to cache
+        """
+        key = self.make_key(text, voice)
+        if self.memory:
+            self.memory.put(key, data)
+        self._write_entry(key, voice, data)
+
+    async def put_async(self, text: str, voice: str, data: bytes) -> None:
+        """
+        Store audio bytes for (text, voice) in the cache.
+        The disk entry is written in the default executor so the file
+        operations stay off the event loop.
+        
+        Args:
+            text: Text segment
+            voice: Voice ID
+            data: MP3 bytes to cache
+        """
+        key = self.make_key(text, voice)
+        if self.memory:
+            self.memory.put(key, data)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._write_entry, key, voice, data)
+
+    def _write_entry(self, key: str, voice: str, data: bytes) -> None:
+        """Atomically write an audio file and its metadata sidecar."""
+        cache_path = self._prefix + key + '.mp3'
+        tmp_path = _temp_path(cache_path)
+
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, cache_path)
+            with open(self._prefix + key + '.json', 'w', encoding='utf-8') as f:
+                json.dump({'voice': voice, 'createAt': time.time(), 'ttl': self.ttl}, f)
+        except Exception as e:
+            logger.warning(f"Could not store cache entry {cache_path}: {e}")
+            try:
+                os.unlink(tmp_path)
+            except Exception:
+                pass
+
+    def prune(self) -> int:
+        """
+        Remove cache entries whose ttl has expired.
+        
+        Returns:
+            int: Number of entries removed
+        """
+        removed = 0
+        now = time.time()
+
+        # Every server worker prunes the same directory, so another one may
+        # remove an entry first; a vanished file is skipped, not an error
+        for meta_path in self.cache_dir.glob('*.json'):
+            try:
+                with open(meta_path, encoding='utf-8') as f:
+                    meta = json.load(f)
+                if meta['createAt'] + meta['ttl'] > now:
+                    continue
+
+                meta_path.with_suffix('.mp3').unlink(missing_ok=True)
+                meta_path.unlink(missing_ok=True)
+                removed += 1
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                logger.error("Error pruning cache entry %s: %s", meta_path, e)
+
+        return removed
+
+def _is_throttled(error: BaseException) -> bool:
+    """Return True if an error is the service refusing a request with 429."""
+    return isinstance(error, aiohttp.ClientResponseError) and error.status == 429
+
+class AdaptiveLimiter:
+    """
+    Async context manager bounding concurrent service requests.
+    The limit halves whenever a request inside it is throttled with 429
+    and grows back by one after a run of successful requests, staying
+    between min_limit and max_limit (additive increase, multiplicative
+    decrease). Requests already in flight are never interrupted; a lower
+    limit only holds back new ones.
+    """
+    def __init__(self,
+                 max_limit: int = MAX_CONCURRENT_TASKS,
+                 min_limit: int = MIN_CONCURRENT_TASKS,
+                 recovery_successes: int = CONCURRENCY_RECOVERY_SUCCESSES):
+        """
+        Initialize AdaptiveLimiter at its maximum.
+        
+        Args:
+            max_limit: Highest and initial number of requests in flight
+            min_limit: Lowest limit backed off to under throttling
+            recovery_successes: Successful requests before the limit grows by one
+        """
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.recovery_successes = recovery_successes
+        self.limit = max_limit
+        self._active = 0
+        self._successes = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._active < self.limit)
+            self._active += 1
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        # The slot is returned before any await, so a task cancelled while
+        # waiting for the condition lock cannot leak it
+        self._active -= 1
+        if exc is not None and _is_throttled(exc):
+            self._successes = 0
+            if self.limit > self.min_limit:
+                self.limit = max(self.min_limit, self.limit // 2)
+                logger.warning(f"Service throttled, concurrency limit lowered to {self.limit}")
+        elif exc_type is None:
+            self._successes += 1
+            if self._successes >= self.recovery_successes and self.limit < self.max_limit:
+                self._successes = 0
+                self.limit += 1
+
+        async with self._condition:
+            self._condition.notify_all()
+
 class SpeechGenerator:
-    def __init__(self, work_dir: Path):
+    def __init__(self,
+                 work_dir: Optional[Path] = None,
+                 cache: Optional[SynthesisCache] = None,
+                 max_concurrency: int = MAX_CONCURRENT_TASKS,
+                 min_concurrency: int = MIN_CONCURRENT_TASKS):
         """
         Initialize SpeechGenerator with working directory.
         
         Args:
-            work_dir: Directory for temporary files
+            work_dir: Default directory for temporary files written by the
+                file-output methods, which may also be given one per call
+            cache: Optional synthesis cache shared across requests
+            max_concurrency: Maximum service requests in flight at once
+            min_concurrency: Limit the generator backs off to while throttled
         """
         self.work_dir = work_dir
+        self.cache = cache
+        # Caps in-flight service requests across every call on this generator,
+        # backing off while the service answers 429
+        self.sem = AdaptiveLimiter(max_concurrency, min_concurrency)
+        self._inflight: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
         self.text_processor = TextProcessor()
+        # Every generator in the process synthesizes over one shared session
+        SharedSession.install()
 
     async def generate_speech(self, 
                             text: str, 
                             voice: str, 
                             output_file: str, 
-                            timeout: int = DEFAULT_TIMEOUT) -> bool:
+                            timeout: int = DEFAULT_TIMEOUT,
+                            sem: Optional[Union[asyncio.BoundedSemaphore, AdaptiveLimiter]] = None) -> bool:
         """
-        Generate speech for a given text segment.
+        Generate speech for a given text segment into a file.
+        Thin wrapper around generate_speech_bytes for callers that need a
+        path; cached segments are linked without being read.
         
         Args:
             text: Text to convert to speech
             voice: Voice ID to use
             output_file: Output file path
-            timeout: Maximum time to wait for generation
+            timeout: Maximum time to wait for each audio chunk
+            sem: Limiter bounding concurrent requests to the service, defaults to
+                the generator's AdaptiveLimiter
             
         Returns:
             bool: Success status
@@ -47,25 +528,403 @@ class SpeechGenerator:
             text = text.strip()
             if not text:
                 raise ValueError("Empty text segment")
+
+            if self.cache and self.cache.fetch(text, voice, output_file):
+                logger.info("Cache hit for text: '%.50s'", text)
+                return True
             
-            communicate = edge_tts.Communicate(text, voice)
-            await asyncio.wait_for(communicate.save(output_file), timeout=timeout)
-            
-            if not Path(output_file).exists() or Path(output_file).stat().st_size == 0:
-                raise ValueError(f"Failed to generate audio for text: {text[:50]}...")
-                
-            logger.info(f"Generated speech for text: '{text}'")
+            data = await self.generate_speech_bytes(text, voice, timeout, sem)
+
+            # The entry has been stored, so link it rather than write a second copy
+            if self.cache and self.cache.link(text, voice, output_file):
+                return True
+
+            # A file left by an earlier call may be a link to the cache entry
+            _replace_file(output_file, data)
+
             return True
             
         except Exception as e:
             logger.error(f"Error generating speech: {str(e)}")
             raise
 
+    async def generate_speech_bytes(self,
+                                    text: str,
+                                    voice: str,
+                                    timeout: int = DEFAULT_TIMEOUT,
+                                    sem: Optional[Union[asyncio.BoundedSemaphore, AdaptiveLimiter]] = None) -> bytes:
+        """
+        Generate speech for a given text segment in memory.
+        Nothing is written to disk apart from the synthesis cache entry.
+        
+        Args:
+            text: Text to convert to speech
+            voice: Voice ID to use
+            timeout: Maximum time to wait for each audio chunk
+            sem: Limiter bounding concurrent requests to the service, defaults to
+                the generator's AdaptiveLimiter
+            
+        Returns:
+            bytes: MP3 audio for the segment
+            
+        Raises:
+            ValueError: If text is empty or generation fails
+        """
+        text = text.strip()
+        if not text:
+            raise ValueError("Empty text segment")
+
+        return b"".join([data async for data in self.synthesize(text, voice, timeout, sem)])
+
+    async def generate_audio(self,
+                             segments: List[Tuple[str, str]],
+                             timeout: int = DEFAULT_TIMEOUT,
+                             sem: Optional[Union[asyncio.BoundedSemaphore, AdaptiveLimiter]] = None) -> bytes:
+        """
+        Generate speech for planned segments and concatenate it in memory.
+        MP3 frames concatenate byte-wise, so no temp files or merge are needed.
+        
+        Args:
+            segments: List of tuples (segment_text, voice_id)
+            timeout: Maximum time to wait for each audio chunk
+            sem: Limiter bounding concurrent requests to the service, defaults to
+                the generator's AdaptiveLimiter
+            
+        Returns:
+            bytes: MP3 audio for all segments in order
+        """
+        return b"".join([data async for data in self.stream_speech(segments, timeout, sem)])
+
+    async def synthesize(self,
+                         text: str,
+                         voice: str,
+                         timeout: int = DEFAULT_TIMEOUT,
+                         sem: Optional[Union[asyncio.BoundedSemaphore, AdaptiveLimiter]] = None) -> AsyncIterator[bytes]:
+        """
+        Stream MP3 audio for a single segment.
+        Cached segments are yielded directly without contacting the service,
+        and concurrent misses for the same segment share a single fetch.
+        Retries with exponential backoff when the service returns no audio
+        or throttles the request before any audio has been yielded.
+        
+        Args:
+            text: Text segment to convert
+            voice: Voice ID to use
+            timeout: Maximum time to wait for each audio chunk
+            sem: Limiter bounding concurrent requests to the service, defaults to
+                the generator's AdaptiveLimiter
+            
+        Yields:
+            MP3 byte chunks
+            
+        Raises:
+            ValueError: If the segment produces no audio
+        """
+        if self.cache:
+            data = await self.cache.get_async(text, voice)
+            if data is not None:
+                logger.info("Cache hit for text: '%.50s'", text)
+                yield data
+                return
+
+            # Concurrent requests for the same segment share one fetch: later
+            # callers wait for the first and are then served from the cache
+            async with self._segment_lock(text, voice):
+                data = await self.cache.get_async(text, voice)
+                if data is not None:
+                    logger.info("Cache hit for text: '%.50s'", text)
+                    yield data
+                    return
+
+                async for data in self._fetch_audio(text, voice, timeout, sem):
+                    yield data
+            return
+
+        async for data in self._fetch_audio(text, voice, timeout, sem):
+            yield data
+
+    def _segment_lock(self, text: str, voice: str) -> asyncio.Lock:
+        """Return the lock shared by in-flight syntheses of (text, voice)."""
+        key = SynthesisCache.make_key(text, voice)
+        lock = self._inflight.get(key)
+        if lock is None:
+            lock = self._inflight[key] = asyncio.Lock()
+        return lock
+
+    async def _fetch_audio(self,
+                           text: str,
+                           voice: str,
+                           timeout: int,
+                           sem: Optional[Union[asyncio.BoundedSemaphore, AdaptiveLimiter]]) -> AsyncIterator[bytes]:
+        """
+        Stream MP3 audio for a segment from the service and cache the result.
+        Retries with exponential backoff when the service returns no audio
+        or throttles the request, but only while the attempt has yielded
+        nothing; a later turn of a long text failing, including a throttled
+        handshake, would otherwise replay audio already streamed.
+        """
+        sem = sem or self.sem
+        for attempt in range(MAX_RETRIES + 1):
+            chunks = []
+            try:
+                async with sem:
+                    stream = edge_tts.Communicate(text, voice).stream()
+                    try:
+                        while True:
+                            try:
+                                chunk = await asyncio.wait_for(stream.__anext__(), timeout=timeout)
+                            except StopAsyncIteration:
+                                break
+                            if chunk["type"] == "audio":
+                                chunks.append(chunk["data"])
+                                yield chunk["data"]
+                    finally:
+                        await stream.aclose()
+                break
+            except Exception as e:
+                # Long texts span several websocket turns, so a failure can follow
+                # audio already yielded; only an attempt that yielded nothing is retried
+                if chunks or not (isinstance(e, NoAudioReceived) or _is_throttled(e)) or attempt == MAX_RETRIES:
+                    raise
+                delay = RETRY_BASE_DELAY * 2 ** attempt
+                reason = "Throttled" if _is_throttled(e) else "No audio received"
+                logger.warning(f"{reason} for text: '{text[:50]}', retrying in {delay}s")
+                await asyncio.sleep(delay)
+
+        if not chunks:
+            raise ValueError(f"Failed to generate audio for text: {text[:50]}...")
+
+        if self.cache:
+            # Chunks are joined once, only when they are kept
+            await self.cache.put_async(text, voice, b"".join(chunks))
+
+        # Per-segment logs format lazily, and truncate, only if INFO is enabled
+        logger.info("Generated speech for text: '%.50s'", text)
+
+    async def _fetch_segment(self,
+                             text: str,
+                             voice: str,
+                             queue: asyncio.Queue,
+                             sem: Union[asyncio.BoundedSemaphore, AdaptiveLimiter],
+                             timeout: int) -> None:
+        """
+        Synthesize one segment into a queue.
+        The queue receives audio chunks followed by None, or the raised exception.
+        """
+        try:
+            async for data in self.synthesize(text, voice, timeout, sem):
+                queue.put_nowait(data)
+            queue.put_nowait(None)
+        except Exception as e:
+            queue.put_nowait(e)
+
+    async def stream_speech(self,
+                            segments: List[Tuple[str, str]],
+                            timeout: int = DEFAULT_TIMEOUT,
+                            sem: Optional[Union[asyncio.BoundedSemaphore, AdaptiveLimiter]] = None,
+                            prefetch: int = STREAM_PREFETCH) -> AsyncIterator[bytes]:
+        """
+        Stream MP3 audio for planned segments in order.
+        The segment being streamed and up to `prefetch` following segments
+        are synthesized concurrently (bounded by sem), so buffered audio
+        stays bounded when the client reads slowly. Segments repeated
+        within the call are synthesized once. Even a lone segment is
+        synthesized by a task into a queue, so its service slot and
+        segment lock are released when synthesis ends, not when a slow
+        client finishes reading.
+        
+        Args:
+            segments: List of tuples (segment_text, voice_id)
+            timeout: Maximum time to wait for each audio chunk
+            sem: Limiter bounding concurrent requests to the service, defaults to
+                the generator's AdaptiveLimiter
+            prefetch: Number of segments synthesized ahead of the current one
+            
+        Yields:
+            MP3 byte chunks
+            
+        Raises:
+            ValueError: If a segment produces no audio
+        """
+        sem = sem or self.sem
+
+        # Repeated segments are synthesized once and replayed from the first
+        # occurrence, whose audio is kept only if it recurs
+        first_index = {}
+        repeats = {}
+        for index, segment in enumerate(segments):
+            source = first_index.setdefault(segment, index)
+            if source != index:
+                repeats[source] = []
+
+        queues = [asyncio.Queue() for _ in segments]
+        tasks = []
+
+        try:
+            for index, queue in enumerate(queues):
+                # Launch segments up to `prefetch` ahead of the one being drained
+                while len(tasks) < min(index + prefetch + 1, len(segments)):
+                    segment = segments[len(tasks)]
+                    if first_index[segment] != len(tasks):
+                        tasks.append(None)
+                        continue
+                    text, voice = segment
+                    tasks.append(asyncio.create_task(
+                        self._fetch_segment(text, voice, queues[len(tasks)], sem, timeout)
+                    ))
+
+                source = first_index[segments[index]]
+                if source != index:
+                    # The first occurrence has already been drained in full
+                    for item in repeats[source]:
+                        yield item
+                    continue
+
+                kept = repeats.get(index)
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    if kept is not None:
+                        kept.append(item)
+                    yield item
+        finally:
+            for task in tasks:
+                if task is not None:
+                    task.cancel()
+
+    async def warm_cache(self,
+                         phrases: List[str],
+                         sem: Optional[Union[asyncio.BoundedSemaphore, AdaptiveLimiter]] = None) -> int:
+        """
+        Pre-synthesize phrases for every voice so later requests hit the cache.
+        
+        Args:
+            phrases: Texts to synthesize
+            sem: Limiter bounding concurrent requests to the service, defaults to
+                the generator's AdaptiveLimiter
+            
+        Returns:
+            int: Number of segments available in the cache
+        """
+        sem = sem or self.sem
+        # Each phrase is split once and voiced for every gender
+        segments = {
+            (segment, voices[lang])
+            for phrase in phrases
+            for segment, lang in self.split_segments(phrase)
+            for voices in VOICES.values()
+        }
+
+        async def warm(text: str, voice: str) -> bool:
+            try:
+                async for _ in self.synthesize(text, voice, sem=sem):
+                    pass
+                return True
+            except Exception as e:
+                logger.warning(f"Could not warm cache for text '{text[:50]}': {e}")
+                return False
+
+        results = await asyncio.gather(*(warm(text, voice) for text, voice in segments))
+        return sum(results)
+
+    @staticmethod
+    def plan_segments(chunk: str, voice_gender: str) -> List[Tuple[str, str]]:
+        """
+        Split a text chunk into ordered speech segments with their voices.
+        Handles mixed language content and preserves number context.
+        Static so it can be sent to a worker process for large texts.
+        
+        Args:
+            chunk: Text chunk to split
+            voice_gender: Gender of voice to use
+            
+        Returns:
+            List of tuples (segment_text, voice_id)
+        """
+        # Resolve the voice table once; each segment is then a single lookup
+        voices = VOICES[voice_gender]
+        return [(segment, voices[lang]) for segment, lang in SpeechGenerator.split_segments(chunk)]
+
+    @staticmethod
+    def split_segments(chunk: str) -> List[Tuple[str, str]]:
+        """
+        Split a text chunk into ordered speech segments with their languages.
+        The split does not depend on the voice, so it can be shared by
+        every voice gender.
+        
+        Args:
+            chunk: Text chunk to split
+            
+        Returns:
+            List of tuples (segment_text, language_code)
+        """
+        # Split the chunk into separate lines, preserving empty lines
+        lines = chunk.split('\n')
+        segments = []
+
+        for line in lines:
+            stripped_line = line.strip()
+            if not stripped_line:
+                continue
+
+            # Short lines recur (headings, prompts, line numbers), so their
+            # splits are memoized; long ones are split directly
+            if len(stripped_line) <= MAX_SEGMENT_LENGTH:
+                segments.extend(_split_short_line(stripped_line))
+            else:
+                segments.extend(SpeechGenerator.split_line(stripped_line))
+
+        return segments
+
+    @staticmethod
+    def split_line(line: str) -> List[Tuple[str, str]]:
+        """
+        Split one stripped, non-empty line into speech segments with their languages.
+        
+        Args:
+            line: Line to split
+            
+        Returns:
+            List of tuples (segment_text, language_code)
+        """
+        # Handle standalone numbers (e.g., line numbers)
+        if line.isdigit():
+            return [(line, 'en')]
+
+        # Detect text type for the whole line
+        text_type = TextProcessor.detect_text_type(line)
+
+        if text_type == 'en':
+            # Process English text; the splitter already strips and length-checks
+            line_segments = [
+                (sentence, 'en')
+                for sentence in TextProcessor.iter_english_sentences(line)
+            ]
+
+        elif text_type == 'zh':
+            # Process Chinese text, keeping numbers in context
+            line_segments = [
+                (sentence, 'zh')
+                for sentence in TextProcessor.split_chinese_text(line)
+            ]
+
+        else:  # mixed text
+            # Process mixed text with context-aware number handling
+            line_segments = TextProcessor.split_mixed_text(line)
+
+        # Short clauses of a line share a request; line breaks stay boundaries
+        return TextProcessor.batch_segments(line_segments)
+
     async def process_text_chunk(self, 
                                chunk: str, 
                                voice_gender: str, 
                                session_id: str, 
-                               chunk_index: int) -> List[str]:
+                               chunk_index: int,
+                               sem: Optional[Union[asyncio.BoundedSemaphore, AdaptiveLimiter]] = None,
+                               work_dir: Optional[Path] = None) -> List[str]:
         """
         Process a text chunk and generate speech segments.
         Handles mixed language content and preserves number context.
@@ -74,82 +933,94 @@ class SpeechGenerator:
             chunk: Text chunk to process
             voice_gender: Gender of voice to use
             session_id: Unique session identifier
-            chunk_index: Index of current chunk
+            chunk_index: Index of current chunk, part of every file name so
+                calls in one session never share files
+            sem: Limiter bounding concurrent requests to the service, defaults to
+                the generator's AdaptiveLimiter
+            work_dir: Directory for the segment files, defaults to self.work_dir
             
         Returns:
-            List of generated audio file paths
+            List of generated audio file paths, in segment order; repeated
+            segments within the chunk share one file
+        
+        Raises:
+            ValueError: If neither the call nor the generator has a work_dir
         """
         try:
-            # Split the chunk into separate lines, preserving empty lines
-            lines = chunk.split('\n')
-            chunk_files = []
-            
-            for i, line in enumerate(lines):
-                stripped_line = line.strip()
-                if not stripped_line:
-                    continue
-
-                # Keep original line position for file naming
-                original_index = i
-
-                # Handle standalone numbers (e.g., line numbers)
-                if stripped_line.isdigit():
-                    voice = VOICES[voice_gender]['en']
-                    temp_file = self.work_dir / f'segment_{chunk_index}_{original_index}_0_{session_id}.mp3'
-                    await self.generate_speech(stripped_line, voice, str(temp_file))
-                    chunk_files.append(str(temp_file))
-                    continue
-
-                # Detect text type for the whole line
-                text_type = self.text_processor.detect_text_type(stripped_line)
-
-                if text_type == 'en':
-                    # Process English text
-                    sentences = self.text_processor.split_english_sentences(stripped_line)
-                    voice = VOICES[voice_gender]['en']
-                    
-                    for j, sentence in enumerate(sentences):
-                        if len(sentence.strip()) >= MIN_SEGMENT_LENGTH or sentence.strip().isdigit():
-                            temp_file = self.work_dir / f'segment_{chunk_index}_{original_index}_{j}_{session_id}.mp3'
-                            await self.generate_speech(sentence, voice, str(temp_file))
-                            chunk_files.append(str(temp_file))
-
-                elif text_type == 'zh':
-                    # Process Chinese text, keeping numbers in context
-                    sentences = self.text_processor.split_chinese_text(stripped_line)
-                    voice = VOICES[voice_gender]['zh']
-                    
-                    for j, sentence in enumerate(sentences):
-                        if len(sentence.strip()) >= 1:
-                            temp_file = self.work_dir / f'segment_{chunk_index}_{original_index}_{j}_{session_id}.mp3'
-                            await self.generate_speech(sentence, voice, str(temp_file))
-                            chunk_files.append(str(temp_file))
-
-                else:  # mixed text
-                    # Process mixed text with context-aware number handling
-                    segments = self.text_processor.split_mixed_text(stripped_line)
-                    
-                    for j, (segment, lang) in enumerate(segments):
-                        voice = VOICES[voice_gender][lang]
-                        # Use appropriate minimum length based on language
-                        min_len = 1 if lang == 'zh' else MIN_SEGMENT_LENGTH
-                        
-                        if len(segment.strip()) >= min_len or segment.strip().isdigit():
-                            temp_file = self.work_dir / f'segment_{chunk_index}_{original_index}_{j}_{session_id}.mp3'
-                            await self.generate_speech(segment, voice, str(temp_file))
-                            chunk_files.append(str(temp_file))
-
-            return chunk_files
+            return [temp_file async for temp_file in self.iter_text_chunk(
+                chunk, voice_gender, session_id, chunk_index, sem, work_dir
+            )]
 
         except Exception as e:
             logger.error(f"Error processing chunk: {str(e)}")
             raise
 
+    async def iter_text_chunk(self,
+                              chunk: str,
+                              voice_gender: str,
+                              session_id: str,
+                              chunk_index: int,
+                              sem: Optional[Union[asyncio.BoundedSemaphore, AdaptiveLimiter]] = None,
+                              work_dir: Optional[Path] = None) -> AsyncIterator[str]:
+        """
+        Generate speech segments for a text chunk, yielding each file as it is ready.
+        Every segment is started at once (bounded by sem), and files are
+        yielded in segment order, so a consumer can stitch the first ones
+        while later ones are still being synthesized.
+        
+        Args:
+            chunk: Text chunk to process
+            voice_gender: Gender of voice to use
+            session_id: Unique session identifier
+            chunk_index: Index of current chunk, part of every file name so
+                calls in one session never share files
+            sem: Limiter bounding concurrent requests to the service, defaults to
+                the generator's AdaptiveLimiter
+            work_dir: Directory for the segment files, defaults to self.work_dir
+            
+        Yields:
+            Generated audio file paths, in segment order; repeated segments
+            share one file
+        
+        Raises:
+            ValueError: If neither the call nor the generator has a work_dir
+        """
+        chunk_files = []
+        work_dir = work_dir or self.work_dir
+        if work_dir is None:
+            raise ValueError("No work directory: pass work_dir to SpeechGenerator or to this call")
+        sem = sem or self.sem
+
+        pending = {}
+        # Stable parts of the file names, formatted once per chunk; the chunk
+        # index keeps each call's files apart from other calls in the session
+        prefix = os.path.join(work_dir, f'segment_{chunk_index}_')
+        suffix = f'_{session_id}.mp3'
+
+        for segment, voice in self.plan_segments(chunk, voice_gender):
+            # Files are named by content, so repeated segments are generated once
+            temp_file = prefix + SynthesisCache.make_key(segment, voice) + suffix
+            if temp_file not in pending:
+                pending[temp_file] = asyncio.create_task(
+                    self.generate_speech(segment, voice, temp_file, sem=sem)
+                )
+            chunk_files.append(temp_file)
+
+        try:
+            for temp_file in chunk_files:
+                await pending[temp_file]
+                yield temp_file
+        finally:
+            # Stop the remaining segments on failure or when the consumer stops early
+            for task in pending.values():
+                task.cancel()
+
     async def process_single_line(self,
                                 line: str,
                                 voice_gender: str,
                                 session_id: str,
-                                line_index: int) -> List[str]:
+                                line_index: int,
+                                work_dir: Optional[Path] = None) -> List[str]:
         """
         Process a single line of text.
         Handles standalone numbers and mixed content.
@@ -158,25 +1029,20 @@ class SpeechGenerator:
             line: Single line of text to process
             voice_gender: Gender of voice to use
             session_id: Unique session identifier
-            line_index: Index of the line
+            line_index: Index of the line, used as the chunk index in file names
+            work_dir: Directory for the segment files, defaults to self.work_dir
             
         Returns:
             List of generated audio file paths
+        
+        Raises:
+            ValueError: If neither the call nor the generator has a work_dir
         """
         try:
-            # Handle empty lines
-            if not line.strip():
-                return []
-
-            # Handle standalone numbers
-            if line.strip().isdigit():
-                voice = VOICES[voice_gender]['en']
-                temp_file = self.work_dir / f'segment_0_{line_index}_0_{session_id}.mp3'
-                await self.generate_speech(line.strip(), voice, str(temp_file))
-                return [str(temp_file)]
-
-            # Process regular text
-            return await self.process_text_chunk(line, voice_gender, session_id, line_index)
+            # plan_segments already skips empty lines and voices standalone
+            # numbers in English, so a line is just a one-line chunk
+            return await self.process_text_chunk(line, voice_gender, session_id, line_index,
+                                                 work_dir=work_dir)
 
         except Exception as e:
             logger.error(f"Error processing line: {str(e)}")
@@ -189,10 +1055,27 @@ class SpeechGenerator:
         Args:
             files: List of file paths to clean up
         """
-        for file in files:
-            try:
-                path = Path(file)
-                if path.exists():
-                    path.unlink()
-            except Exception as e:
-                logger.error(f"Error cleaning up file {file}: {str(e)}")
+        FileManager.cleanup_files(files)
+
+    async def cleanup_files_async(self, files: List[str]) -> None:
+        """
+        Clean up temporary audio files without blocking the event loop.
+        All removals run as one job in the default executor.
+        
+        Args:
+            files: List of file paths to clean up
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, FileManager.cleanup_files, files)
+
+    async def close(self) -> None:
+        """
+        Close the shared HTTP session used for synthesis.
+        A later request on any generator opens a new one.
+        """
+        await SharedSession.close()
+
+@functools.lru_cache(maxsize=LINE_CACHE_SIZE)
+def _split_short_line(line: str) -> Tuple[Tuple[str, str], ...]:
+    """Memoized SpeechGenerator.split_line; a tuple, so callers cannot alter the cached value."""
+    return tuple(SpeechGenerator.split_line(line))
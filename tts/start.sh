@@ -1,2 +1,3 @@
 #!/bin/bash
-gunicorn -w 4 -b 127.0.0.1:5001 app:app
+# One uvloop worker per CPU unless WORKERS is set
+hypercorn -k uvloop -w "${WORKERS:-$(nproc)}" --backlog 2048 -b 127.0.0.1:5001 app:app
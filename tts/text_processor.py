@@ -4,8 +4,99 @@ Text processing module for multilingual TTS system.
 Handles text segmentation, language detection, and context-aware number processing.
 """
 import re
-from typing import List, Tuple
-from config import MAX_SEGMENT_LENGTH, MIN_SEGMENT_LENGTH
+import string
+from typing import Iterable, Iterator, List, Tuple
+from config import MAX_SEGMENT_LENGTH, MIN_SEGMENT_LENGTH, SEGMENT_BATCH_LENGTH
+
+# Chinese characters and punctuation, shared by every pattern below. The ASCII
+# double quote counts as Chinese punctuation; the apostrophe does not, so
+# English contractions stay English
+_ZH_CHARS = r'\u4e00-\u9fff，。！？；："（）、'
+
+# Patterns compiled once at import instead of on every call
+_CHINESE_RE = re.compile(f'[{_ZH_CHARS}]')
+_ENGLISH_RE = re.compile(r'[a-zA-Z]')
+_ENGLISH_LETTERS = frozenset(string.ascii_letters)
+_CJK_RE = re.compile(r'[\u4e00-\u9fff]')
+# A Chinese character or punctuation mark, or an English letter; one character
+# class keeps the engine's fast set scan that an alternation would lose
+_DETECT_RE = re.compile(f'[{_ZH_CHARS}a-zA-Z]')
+# Text up to and including the next major / minor punctuation mark
+_MAJOR_PUNCT_RE = re.compile(r'([^。！？；]*)([。！？；]?)')
+_MINOR_PUNCT_RE = re.compile(r'[^，、：]*[，、：]?')
+# Sentence and clause endings an English word may carry, checked in one call
+_BREAK_MARKS = ('.', '!', '?', ',', ';', ':')
+# One of those marks at the end of a word, i.e. not followed by a non-space
+_BREAK_MARK_RE = re.compile(r'[.!?,;:](?!\S)')
+# An English word: a run of non-whitespace
+_WORD_RE = re.compile(r'\S+')
+
+# Number with symbols: decimal digits, points and percent signs
+_NUMBER_RUN_RE = re.compile(r'[\d.%]*')
+
+# Same-language runs, including any spaces and punctuation between them; the
+# separators are neither word characters (so never digits) nor Chinese
+_ZH_RUN_RE = re.compile(rf'[{_ZH_CHARS}]+(?:[^\w{_ZH_CHARS}]+[{_ZH_CHARS}]+)*')
+_EN_RUN_RE = re.compile(rf'[a-zA-Z]+(?:[^\w{_ZH_CHARS}]+[a-zA-Z]+)*')
+# Tokenizer over those runs: group 1 is a Chinese run, group 2 a number,
+# group 3 an English run and group 4 any other word character, which may
+# be a digit such as a superscript that \d does not match
+_TOKEN_RE = re.compile(
+    '(' + _ZH_RUN_RE.pattern + r')|(\d[\d.%]*)|(' + _EN_RUN_RE.pattern +
+    r')|([^\W\d_a-zA-Z\u4e00-\u9fff])'
+)
+
+# Letter or digit that starts a run or number in ASCII text
+_ASCII_WORD_RE = re.compile(r'[a-zA-Z0-9]')
+
+def _is_chinese_context(text: str, pos: int) -> bool:
+    """Helper function to determine if a position is in Chinese context."""
+    # Look at surrounding context (up to 5 chars before and after)
+    # by bounding the search instead of slicing the text
+    return bool(_CJK_RE.search(text, max(0, pos-5), min(len(text), pos+5)))
+
+def _is_abbreviation(word: str) -> bool:
+    """Return True for a word whose trailing period does not end a sentence."""
+    return (word.endswith('.') and 
+            not word[:-1].isdigit() and
+            (all(c.isupper() for c in word[:-1]) or 
+             len(word) <= 3))
+
+def _split_words(words: Iterable[str]) -> Iterator[str]:
+    """Group English words into segments, breaking at marks or at the length limit."""
+    current_sentence = []
+    # Length of ' '.join(current_sentence), kept without re-joining per word
+    current_length = -1
+
+    for word in words:
+        current_sentence.append(word)
+        current_length += len(word) + 1
+        
+        if (word.endswith(_BREAK_MARKS) or 
+            current_length >= MAX_SEGMENT_LENGTH):
+            
+            # Handle abbreviations and numbers with periods
+            if _is_abbreviation(word):
+                continue
+            
+            # Words carry no whitespace, so the joined sentence is already stripped
+            sentence = ' '.join(current_sentence)
+            if len(sentence) >= MIN_SEGMENT_LENGTH or sentence.isdigit():
+                yield sentence
+            current_sentence = []
+            current_length = -1
+
+    # Handle remaining text
+    if current_sentence:
+        sentence = ' '.join(current_sentence)
+        if len(sentence) >= MIN_SEGMENT_LENGTH or sentence.isdigit():
+            yield sentence
+
+def _flush_segment(segments: List[Tuple[str, str]], buffer: str, lang: str) -> None:
+    """Append a buffered mixed-text segment, stripped, unless it is empty or a stray English fragment."""
+    segment = buffer.strip()
+    if segment and (lang == 'zh' or len(segment) >= MIN_SEGMENT_LENGTH or segment.isdigit()):
+        segments.append((segment, lang))
 
 class TextProcessor:
     @staticmethod
@@ -37,23 +128,31 @@ class TextProcessor:
         Returns:
             str: 'zh', 'en', or 'mixed'
         """
-        if not text.strip():
+        stripped = text.strip()
+        if not stripped:
             return 'en'
             
         # Handle standalone numbers
-        if text.strip().isdigit():
+        if stripped.isdigit():
             return 'en'
 
-        # Check for Chinese characters and punctuation
-        has_chinese = bool(re.search(r'[\u4e00-\u9fff，。！？；：""''（）、]', text))
-        # Check for English characters (excluding numbers initially)
-        has_english = bool(re.search(r'[a-zA-Z]', text))
-        
-        if has_chinese and has_english:
-            return 'mixed'
-        elif has_chinese:
-            return 'zh'
-        return 'en'
+        # ASCII text can only match the Chinese class through the double quote,
+        # and isascii() is a flag check rather than a scan
+        if text.isascii() and '"' not in text:
+            return 'en'
+
+        # One pass finds whichever of Chinese or English comes first; the
+        # other cannot occur before it, so its search resumes from there
+        first = _DETECT_RE.search(text)
+        if first is None:
+            # English is the answer whether or not letters are present
+            return 'en'
+
+        if first.group() not in _ENGLISH_LETTERS:
+            # Chinese characters and punctuation found; look for English after them
+            return 'mixed' if _ENGLISH_RE.search(text, first.end()) else 'zh'
+        # English found; the text is English unless Chinese follows
+        return 'mixed' if _CHINESE_RE.search(text, first.end()) else 'en'
 
     @staticmethod
     def split_english_sentences(text: str) -> List[str]:
@@ -65,45 +164,61 @@ class TextProcessor:
             text: English text to split
             
         Returns:
-            List of sentence segments
+            List of stripped sentence segments, each at least
+            MIN_SEGMENT_LENGTH long or a number
         """
-        if not text.strip():
-            return []
+        return list(TextProcessor.iter_english_sentences(text))
+
+    @staticmethod
+    def iter_english_sentences(text: str) -> Iterator[str]:
+        """
+        Lazily split English text into natural speech segments.
+        Sentences are produced as they are found, so callers that consume
+        them one at a time never hold the full list.
+        
+        Args:
+            text: English text to split
+            
+        Yields:
+            Stripped sentence segments, each at least MIN_SEGMENT_LENGTH
+            long or a number
+        """
+        stripped = text.strip()
+        if not stripped:
+            return
 
         # Handle standalone numbers
-        if text.strip().isdigit():
-            return [text.strip()]
+        if stripped.isdigit():
+            yield stripped
+            return
 
-        sentences = []
-        current_sentence = []
-        words = text.split()
+        # A break can only fall on a word ending in a mark, so the regex engine
+        # finds those marks and Python only handles the words between them.
+        # From a stretch long enough to need a length break on, the rest goes
+        # word by word; the words are read off the text rather than split
+        # into a list first.
+        start = 0
+        for match in _BREAK_MARK_RE.finditer(text):
+            end = match.end()
+            if end - start >= MAX_SEGMENT_LENGTH:
+                yield from _split_words(word.group() for word in _WORD_RE.finditer(text, start))
+                return
+            words = text[start:end].split()
+            if _is_abbreviation(words[-1]):
+                continue
 
-        for word in words:
-            current_sentence.append(word)
-            
-            if (word.endswith(('.', '!', '?')) or 
-                word.endswith((',', ';', ':')) or 
-                len(' '.join(current_sentence)) >= MAX_SEGMENT_LENGTH):
-                
-                # Handle abbreviations and numbers with periods
-                if (word.endswith('.') and 
-                    not word[:-1].isdigit() and
-                    (all(c.isupper() for c in word[:-1]) or 
-                     len(word) <= 3)):
-                    continue
-                
-                sentence = ' '.join(current_sentence).strip()
-                if len(sentence) >= MIN_SEGMENT_LENGTH or sentence.strip().isdigit():
-                    sentences.append(sentence)
-                current_sentence = []
+            sentence = ' '.join(words)
+            if len(sentence) >= MIN_SEGMENT_LENGTH or sentence.isdigit():
+                yield sentence
+            start = end
 
         # Handle remaining text
-        if current_sentence:
-            sentence = ' '.join(current_sentence).strip()
-            if len(sentence) >= MIN_SEGMENT_LENGTH or sentence.strip().isdigit():
-                sentences.append(sentence)
-
-        return sentences
+        if len(text) - start >= MAX_SEGMENT_LENGTH:
+            yield from _split_words(word.group() for word in _WORD_RE.finditer(text, start))
+            return
+        sentence = ' '.join(text[start:].split())
+        if sentence and (len(sentence) >= MIN_SEGMENT_LENGTH or sentence.isdigit()):
+            yield sentence
 
     @staticmethod
     def split_chinese_text(text: str) -> List[str]:
@@ -114,57 +229,49 @@ class TextProcessor:
             text: Chinese text to split
             
         Returns:
-            List of text segments
+            List of stripped, non-empty text segments
         """
-        if not text.strip():
+        stripped = text.strip()
+        if not stripped:
             return []
 
-        # For short text, keep it as one segment
-        if len(text) <= MAX_SEGMENT_LENGTH:
-            return [text.strip()]
+        # For short text, keep it as one segment; ASCII text has no Chinese
+        # punctuation to split at, so it stays whole at any length
+        if len(text) <= MAX_SEGMENT_LENGTH or text.isascii():
+            return [stripped]
 
-        # Split by major punctuation while preserving it
-        segments = re.split(r'([。！？；])', text)
+        # Cut every sentence ending in major punctuation in one C-level pass;
+        # findall hands back plain (text, mark) tuples without match objects
         result = []
-        
-        i = 0
-        while i < len(segments):
-            current = segments[i].strip()
-            
-            if i + 1 < len(segments) and segments[i + 1] in '。！？；':
-                current += segments[i + 1]
-                i += 2
-            else:
-                i += 1
-            
-            if current:
+        for head, mark in _MAJOR_PUNCT_RE.findall(text):
+            current = head.strip() + mark
+            if not current:
+                continue
+
+            if len(current) <= MAX_SEGMENT_LENGTH:
                 result.append(current)
+                continue
 
-        # Only split long segments if necessary
-        final_result = []
-        for segment in result:
-            if len(segment) > MAX_SEGMENT_LENGTH:
-                subsegments = re.split(r'([，、：])', segment)
-                current = ''
-                
-                for j in range(0, len(subsegments), 2):
-                    part = subsegments[j]
-                    if j + 1 < len(subsegments):
-                        part += subsegments[j + 1]
-                    
-                    if len(current + part) <= MAX_SEGMENT_LENGTH:
-                        current += part
-                    else:
-                        if current:
-                            final_result.append(current)
-                        current = part
-                
-                if current:
-                    final_result.append(current)
-            else:
-                final_result.append(segment)
-        
-        return [s for s in final_result if len(s.strip()) >= 1]
+            # Only split long sentences at minor punctuation if necessary;
+            # clauses are collected with a running length and joined once
+            merged = []
+            merged_length = 0
+            for part in _MINOR_PUNCT_RE.findall(current):
+                if merged_length + len(part) <= MAX_SEGMENT_LENGTH:
+                    merged.append(part)
+                    merged_length += len(part)
+                else:
+                    segment = ''.join(merged).strip()
+                    if segment:
+                        result.append(segment)
+                    merged = [part]
+                    merged_length = len(part)
+
+            segment = ''.join(merged).strip()
+            if segment:
+                result.append(segment)
+
+        return result
 
     @staticmethod
     def split_mixed_text(text: str) -> List[Tuple[str, str]]:
@@ -175,84 +282,92 @@ class TextProcessor:
             text: Mixed language text to split
             
         Returns:
-            List of tuples (text_segment, language_code)
+            List of tuples (text_segment, language_code); segments are
+            stripped, and English ones meet MIN_SEGMENT_LENGTH unless numeric
         """
-        if not text.strip():
+        stripped = text.strip()
+        if not stripped:
             return []
 
         # Handle standalone numbers
-        if text.strip().isdigit():
-            return [(text.strip(), 'en')]
+        if stripped.isdigit():
+            return [(stripped, 'en')]
+
+        # Without Chinese every run and number is English, so the text from
+        # the first letter or digit on is a single segment
+        if text.isascii() and '"' not in text:
+            first = _ASCII_WORD_RE.search(text)
+            if first is None:
+                return []
+            segment = text[first.start():].strip()
+            if len(segment) >= MIN_SEGMENT_LENGTH or segment.isdigit():
+                return [(segment, 'en')]
+            return []
 
         segments = []
         current_type = None
-        buffer = ""
-        i = 0
-
-        def is_chinese_context(text: str, pos: int) -> bool:
-            """Helper function to determine if a position is in Chinese context."""
-            # Look at surrounding context (up to 5 chars before and after)
-            pre_text = text[max(0, pos-5):pos]
-            post_text = text[pos:min(len(text), pos+5)]
-            
-            return bool(re.search(r'[\u4e00-\u9fff]', pre_text + post_text))
+        # The buffer is always a contiguous slice of the text, so it is kept
+        # as a start index and sliced once on flush instead of concatenated.
+        # It only ends where the language changes.
+        buffer_start = 0
+        # End of the last number, whose digits the tokenizer also visits
+        number_end = 0
 
-        def flush_buffer():
-            """Helper function to add buffered text to segments."""
-            nonlocal buffer, current_type
-            if buffer.strip():
-                segments.append((buffer, current_type))
-            buffer = ""
+        # The tokenizer finds each run in C and skips the characters between
+        # runs, which join the buffer by lying inside its slice
+        for token in _TOKEN_RE.finditer(text):
+            start = token.start()
+            kind = token.lastindex
+
+            if kind == 1:
+                lang = 'zh'
+            elif kind == 3:
+                lang = 'en'
+            elif start >= number_end and (kind == 2 or text[start].isdigit()):
+                # A \d number token already spans the complete number with
+                # symbols; other digits look ahead from themselves
+                number_end = token.end() if kind == 2 else _NUMBER_RUN_RE.match(text, start).end()
+                # Digits such as superscripts satisfy isdigit() but not \d
+                while number_end < len(text) and text[number_end].isdigit():
+                    number_end = _NUMBER_RUN_RE.match(text, number_end + 1).end()
 
-        while i < len(text):
-            char = text[i]
-            
-            if re.match(r'[\u4e00-\u9fff，。！？；：""''（）、]', char):
-                if current_type != 'zh':
-                    flush_buffer()
-                    current_type = 'zh'
-                buffer += char
-                
-            elif char.isdigit():
-                # Look ahead for complete number with symbols
-                num_start = i
-                while i < len(text) and (text[i].isdigit() or text[i] in '.%'):
-                    i += 1
-                number_with_symbols = text[num_start:i]
-                i -= 1  # Adjust for main loop increment
-                
                 # Determine if number is in Chinese context
-                if is_chinese_context(text, num_start):
-                    if current_type != 'zh':
-                        flush_buffer()
-                        current_type = 'zh'
-                else:
-                    if current_type != 'en':
-                        flush_buffer()
-                        current_type = 'en'
-                
-                buffer += number_with_symbols
-                
-            elif re.match(r'[a-zA-Z]', char):
-                if current_type != 'en':
-                    flush_buffer()
-                    current_type = 'en'
-                buffer += char
-                
-            else:  # Punctuation and spaces
-                if buffer:
-                    buffer += char
-            
-            i += 1
+                lang = 'zh' if _is_chinese_context(text, start) else 'en'
+            else:
+                continue
+
+            if lang != current_type:
+                if current_type is not None:
+                    _flush_segment(segments, text[buffer_start:start], current_type)
+                current_type = lang
+                buffer_start = start
 
         # Handle remaining buffer
-        if buffer:
-            flush_buffer()
-
-        # Post-process segments
-        return [(text.strip(), lang) for text, lang in segments 
-                if text.strip() and (
-                    lang == 'zh' or 
-                    len(text.strip()) >= MIN_SEGMENT_LENGTH or 
-                    text.strip().isdigit()
-                )]
+        if current_type is not None:
+            _flush_segment(segments, text[buffer_start:], current_type)
+        return segments
+
+    @staticmethod
+    def batch_segments(segments: List[Tuple[str, str]],
+                       max_length: int = SEGMENT_BATCH_LENGTH) -> List[Tuple[str, str]]:
+        """
+        Merge consecutive same-language segments into batches.
+        Each batch is synthesized with one service request, so a run of
+        short clauses does not pay a round trip per clause.
+        
+        Args:
+            segments: List of tuples (text_segment, language_code)
+            max_length: Longest merged segment; longer segments stay alone
+            
+        Returns:
+            List of tuples (text_segment, language_code)
+        """
+        batched = []
+        for segment, lang in segments:
+            if batched:
+                last, last_lang = batched[-1]
+                if last_lang == lang and len(last) + 1 + len(segment) <= max_length:
+                    batched[-1] = (last + ' ' + segment, lang)
+                    continue
+            batched.append((segment, lang))
+        return batched
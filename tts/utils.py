@@ -1,17 +1,72 @@
 # utils.py
 """
-Utility functions for file and directory operations.
+Utility functions for file and directory operations and in-memory caching.
 """
+import errno
 import os
+import shutil
 import uuid
 import tempfile
 import logging
+from collections import OrderedDict
 from pathlib import Path
-from typing import List
-from config import BASE_TEMP_DIR  # Changed from relative import
+from typing import List, Optional
+from config import BASE_TEMP_DIR, MEMORY_CACHE_SIZE  # Changed from relative import
 
 logger = logging.getLogger(__name__)
 
+class CacheManager:
+    """
+    In-memory LRU cache mapping keys to audio bytes, bounded by total size.
+    """
+    def __init__(self, max_bytes: int = MEMORY_CACHE_SIZE):
+        """
+        Initialize CacheManager.
+        
+        Args:
+            max_bytes: Maximum cumulative size of cached values
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Look up a key and mark it as most recently used.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached bytes, or None on miss
+        """
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Insert a value, evicting least recently used entries to stay in budget.
+        
+        Args:
+            key: Cache key
+            data: Bytes to cache
+        """
+        if len(data) > self.max_bytes:
+            return
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.current_bytes -= len(old)
+
+        self._entries[key] = data
+        self.current_bytes += len(data)
+
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= len(evicted)
+
 class FileManager:
     @staticmethod
     def ensure_directory_exists(directory: Path) -> None:
@@ -35,16 +90,19 @@ class FileManager:
     def cleanup_files(files: List[str]) -> None:
         """
         Clean up a list of temporary files.
+        Repeated paths are removed once, and missing files are skipped
+        without a separate existence check.
         
         Args:
             files: List of file paths to remove
         """
-        for file in files:
+        for file in dict.fromkeys(files):
             try:
-                if os.path.exists(file):
-                    os.remove(file)
+                os.unlink(file)
+            except FileNotFoundError:
+                pass
             except Exception as e:
-                logger.error(f"Error removing file {file}: {str(e)}")
+                logger.error("Error removing file %s: %s", file, e)
 
     @staticmethod
     def get_temp_dir() -> Path:
@@ -62,10 +120,73 @@ class FileManager:
             temp_dir.mkdir(parents=True, exist_ok=True)
         return temp_dir
 
+    @staticmethod
+    def id3_tag_size(fd: int) -> int:
+        """
+        Return the size of a leading ID3v2 tag in an open file.
+        
+        Args:
+            fd: File descriptor; its position is moved by the read
+            
+        Returns:
+            int: Bytes occupied by the tag, or 0 if there is none
+        """
+        os.lseek(fd, 0, os.SEEK_SET)
+        header = os.read(fd, 10)
+        if len(header) < 10 or header[:3] != b'ID3':
+            return 0
+
+        # Tag size is a 28-bit synchsafe integer excluding the 10-byte header
+        size = 0
+        for byte in header[6:10]:
+            size = (size << 7) | (byte & 0x7f)
+        # A footer flag adds a second 10-byte block at the end of the tag
+        footer = 10 if header[5] & 0x10 else 0
+        return 10 + size + footer
+
+    @staticmethod
+    def copy_to_fd(input_file: str, out_fd: int, skip_id3: bool = False) -> None:
+        """
+        Append a file's contents to an open file descriptor.
+        Uses os.sendfile so the bytes never pass through user space, and
+        falls back to a small-buffer copy where the platform only sends
+        to sockets (macOS) or has no sendfile (Windows).
+        
+        Args:
+            input_file: Path of the file to copy
+            out_fd: Destination file descriptor
+            skip_id3: Leave out a leading ID3v2 tag
+        """
+        in_fd = os.open(input_file, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        try:
+            offset = FileManager.id3_tag_size(in_fd) if skip_id3 else 0
+            size = os.fstat(in_fd).st_size
+
+            if hasattr(os, 'sendfile'):
+                try:
+                    while offset < size:
+                        sent = os.sendfile(out_fd, in_fd, offset, size - offset)
+                        if sent == 0:
+                            break
+                        offset += sent
+                    return
+                except OSError as e:
+                    if e.errno not in (errno.EINVAL, errno.ENOTSOCK, errno.ENOSYS):
+                        raise
+
+            os.lseek(in_fd, offset, os.SEEK_SET)
+            with open(in_fd, 'rb', closefd=False) as src, open(out_fd, 'wb', closefd=False) as dst:
+                shutil.copyfileobj(src, dst)
+        finally:
+            os.close(in_fd)
+
     @staticmethod
     def merge_audio_files(input_files: List[str], output_file: str) -> None:
         """
         Merge multiple audio files into one.
+        MP3 frames concatenate byte-wise, so inputs are copied in the kernel.
+        ID3v2 tags are kept on the first input only, so players do not
+        count later tags as audio.
         
         Args:
             input_files: List of input file paths
@@ -75,15 +196,18 @@ class FileManager:
             if not input_files:
                 raise ValueError("No input files provided")
 
-            with open(output_file, 'wb') as outfile:
-                for file in input_files:
+            flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+            out_fd = os.open(output_file, flags, 0o644)
+            try:
+                for i, file in enumerate(input_files):
                     try:
-                        with open(file, 'rb') as infile:
-                            outfile.write(infile.read())
+                        FileManager.copy_to_fd(file, out_fd, skip_id3=i > 0)
                     except Exception as e:
-                        logger.error(f"Error reading file {file}: {str(e)}")
+                        logger.error("Error reading file %s: %s", file, e)
                         raise
+            finally:
+                os.close(out_fd)
 
         except Exception as e:
-            logger.error(f"Error merging audio files: {str(e)}")
+            logger.error("Error merging audio files: %s", e)
             raise